@@ -1,25 +1,55 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from redis.exceptions import RedisError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.config import settings
 from app.database import get_db
 from app.models import User
+from app.schemas import UserResponse
+from app.cache import cache_get, cache_set, cache_delete
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+# bcrypt is deliberately slow (~100-300 ms) and releases the GIL, so it runs on a dedicated
+# bounded pool instead of blocking the event loop for every other request on the worker
+_password_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_password_jobs_in_flight = 0
 
 
-def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+async def _run_password_job(fn, *args):
+    global _password_jobs_in_flight
+    _password_jobs_in_flight += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_password_executor, fn, *args)
+    finally:
+        _password_jobs_in_flight -= 1
+
+
+def password_pool_stats() -> dict:
+    """Queue depth of the hashing pool: jobs waiting for a thread beyond the ones running."""
+    workers = settings.PASSWORD_HASH_WORKERS
+    return {
+        "workers": workers,
+        "in_flight": _password_jobs_in_flight,
+        "queued": max(0, _password_jobs_in_flight - workers),
+    }
+
+
+async def hash_password(password: str) -> str:
+    return await _run_password_job(pwd_context.hash, password)
+
+
+async def verify_password(plain: str, hashed: str) -> bool:
+    return await _run_password_job(pwd_context.verify, plain, hashed)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -29,6 +59,15 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
+def _user_cache_key(user_id) -> str:
+    return f"user:{user_id}"
+
+
+async def invalidate_user_cache(user_id):
+    """Call after changing a user's profile or active flag so the cached principal is dropped."""
+    await cache_delete(_user_cache_key(user_id))
+
+
 async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -43,8 +82,24 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
     except JWTError:
         raise credentials_exception
 
+    # Cache-aside: a hit returns a detached User built from the cached principal, with no DB query.
+    # Routes that modify the user must load it from their session instead.
+    # Authentication must not depend on Redis, so cache errors fall through to the DB.
+    try:
+        cached = await cache_get(_user_cache_key(user_id))
+    except RedisError:
+        cached = None
+    if cached:
+        principal = UserResponse.model_validate_json(cached)
+        if principal.is_active:
+            return User(**principal.model_dump())
+
     result = await db.execute(select(User).where(User.id == user_id, User.is_active == True))
     user = result.scalar_one_or_none()
     if user is None:
         raise credentials_exception
+    try:
+        await cache_set(_user_cache_key(user.id), UserResponse.model_validate(user).model_dump_json(), ttl=settings.USER_CACHE_TTL)
+    except RedisError:
+        pass
     return user
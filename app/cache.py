@@ -1,8 +1,62 @@
+import time
+import asyncio
+from collections import OrderedDict
+import redis as sync_redis
 import redis.asyncio as redis
 from app.config import settings
 
 redis_client: redis.Redis = None
 
+INVALIDATION_CHANNEL = "cache:invalidate"
+KEY_INVALIDATION_CHANNEL = "cache:invalidate-key"
+
+
+class LocalCache:
+    """Bounded in-process LRU with per-key expiry, holding the same serialized values stored in Redis."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: str) -> str | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            self.delete(key)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str, ttl: int):
+        if ttl <= 0 or len(value) > self.max_bytes:
+            return
+        self.delete(key)
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._bytes += len(value)
+        while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, evicted) = self._data.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def delete(self, key: str):
+        item = self._data.pop(key, None)
+        if item is not None:
+            self._bytes -= len(item[1])
+
+    def clear(self):
+        self._data.clear()
+        self._bytes = 0
+
+
+local_cache = LocalCache(settings.CACHE_L1_MAX_ENTRIES, settings.CACHE_L1_MAX_BYTES)
+
+# namespace -> (checked_at, generation); dropped by the pub/sub listener, re-read after CACHE_GENERATION_TTL
+_generations: dict[str, tuple[float, int]] = {}
+_listener_task: asyncio.Task | None = None
+
 
 async def get_redis() -> redis.Redis:
     global redis_client
@@ -12,28 +66,115 @@ async def get_redis() -> redis.Redis:
 
 
 async def close_redis():
-    global redis_client
+    global redis_client, _listener_task
+    if _listener_task:
+        _listener_task.cancel()
+        _listener_task = None
     if redis_client:
         await redis_client.close()
         redis_client = None
+    local_cache.clear()
+    _generations.clear()
+
+
+def _l1_ttl(ttl: int) -> int:
+    return min(ttl, settings.CACHE_L1_TTL)
 
 
 async def cache_get(key: str) -> str | None:
+    value = local_cache.get(key)
+    if value is not None:
+        return value
     r = await get_redis()
-    return await r.get(key)
+    value = await r.get(key)
+    if value is not None:
+        local_cache.set(key, value, settings.CACHE_L1_TTL)
+    return value
 
 
 async def cache_set(key: str, value: str, ttl: int = 300):
     r = await get_redis()
     await r.set(key, value, ex=ttl)
+    local_cache.set(key, value, _l1_ttl(ttl))
 
 
 async def cache_delete(key: str):
+    """Delete from Redis and tell every worker to drop its L1 copy."""
+    local_cache.delete(key)
     r = await get_redis()
-    await r.delete(key)
+    async with r.pipeline(transaction=False) as pipe:
+        pipe.delete(key)
+        pipe.publish(KEY_INVALIDATION_CHANNEL, key)
+        await pipe.execute()
+
+
+def _generation_key(namespace: str) -> str:
+    return f"gen:{namespace}"
+
+
+def _remember_generation(namespace: str, generation: int):
+    _, known = _generations.get(namespace, (0.0, -1))
+    _generations[namespace] = (time.monotonic(), max(known, generation))
+
+
+async def cache_versioned_key(namespace: str, key: str) -> str:
+    """Build a key under the namespace's current generation. Bumping the generation
+    orphans every key built from the old one; those entries then age out through their TTL."""
+    checked_at, generation = _generations.get(namespace, (0.0, -1))
+    if generation < 0 or time.monotonic() - checked_at > settings.CACHE_GENERATION_TTL:
+        r = await get_redis()
+        generation = int(await r.get(_generation_key(namespace)) or 0)
+        _remember_generation(namespace, generation)
+    return f"{namespace}:{generation}:{key}"
 
 
-async def cache_delete_pattern(pattern: str):
+async def cache_invalidate(*namespaces: str):
+    """O(1) invalidation of whole namespaces, independent of how many keys they hold."""
     r = await get_redis()
-    async for key in r.scan_iter(match=pattern):
-        await r.delete(key)
+    async with r.pipeline(transaction=False) as pipe:
+        for namespace in namespaces:
+            pipe.incr(_generation_key(namespace))
+            pipe.publish(INVALIDATION_CHANNEL, namespace)
+        results = await pipe.execute()
+    for namespace, generation in zip(namespaces, results[::2]):
+        _remember_generation(namespace, generation)
+
+
+def cache_invalidate_sync(*namespaces: str):
+    """cache_invalidate for Celery tasks, which run without an event loop."""
+    r = sync_redis.from_url(settings.redis_url, decode_responses=True)
+    try:
+        with r.pipeline(transaction=False) as pipe:
+            for namespace in namespaces:
+                pipe.incr(_generation_key(namespace))
+                pipe.publish(INVALIDATION_CHANNEL, namespace)
+            pipe.execute()
+    finally:
+        r.close()
+
+
+async def _listen_for_invalidations():
+    # Forget generations and keys other workers have invalidated, so their L1 entries stop being served right away
+    while True:
+        try:
+            r = await get_redis()
+            pubsub = r.pubsub()
+            await pubsub.subscribe(INVALIDATION_CHANNEL, KEY_INVALIDATION_CHANNEL)
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                if message["channel"] == KEY_INVALIDATION_CHANNEL:
+                    local_cache.delete(message["data"])
+                else:
+                    _generations.pop(message["data"], None)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Redis unavailable; generations fall back to CACHE_GENERATION_TTL refreshes meanwhile
+            await asyncio.sleep(1)
+
+
+def start_invalidation_listener():
+    global _listener_task
+    if _listener_task is None:
+        _listener_task = asyncio.create_task(_listen_for_invalidations())
@@ -44,7 +44,8 @@ def send_email_notification(to_email: str, subject: str, body: str):
 @celery_app.task
 def process_task_overdue_check():
     """Check for tasks past due date and mark them overdue. For tasks with notify_overdue=True,
-    create in-app notification and dispatch email."""
+    create in-app notification and dispatch email. Also moves TODO tasks whose start_date has
+    passed to IN_PROGRESS, so read endpoints never have to run these transitions."""
     import datetime
     from sqlalchemy import create_engine, select, update
     from sqlalchemy.orm import Session
@@ -96,7 +97,111 @@ def process_task_overdue_check():
                             f"<p>Task <strong>{task.title}</strong> is overdue. Please update its status.</p>",
                         )
 
+        started = session.execute(
+            update(Task)
+            .where(Task.start_date <= now, Task.status == TaskStatus.TODO, Task.is_deleted == False)
+            .values(status=TaskStatus.IN_PROGRESS)
+        ).rowcount
+
+        session.commit()
+
+    engine.dispose()
+    if marked or started:
+        # Cached task lists and analytics were built from the old statuses
+        from app.cache import cache_invalidate_sync
+        cache_invalidate_sync("tasks", "analytics")
+    return {"status": "processed", "marked_overdue": marked, "marked_in_progress": started, "notifications_sent": notified}
+
+
+@celery_app.task
+def generate_task_export(job_id: str):
+    """Render a task export to a temp file and upload it to S3, recording the result on the ExportJob."""
+    import uuid
+    import datetime
+    import tempfile
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from app.models import ExportJob, ExportStatus
+    from app.exports import export_query, write_export, EXPORT_MEDIA_TYPES
+    from app.storage import upload_fileobj_to_s3
+
+    engine = create_engine(settings.sync_database_url)
+
+    with Session(engine) as session:
+        job = session.get(ExportJob, uuid.UUID(job_id))
+        if not job:
+            engine.dispose()
+            return {"status": "missing", "job_id": job_id}
+        job.status = ExportStatus.RUNNING
+        session.commit()
+
+        fmt = job.format
+        key = f"taskhub/exports/{job.id}.{fmt}"
+        try:
+            with tempfile.TemporaryFile() as tmp:
+                write_export(session.execute(export_query()), fmt, tmp)
+                tmp.seek(0)
+                upload_fileobj_to_s3(tmp, key, EXPORT_MEDIA_TYPES[fmt])
+            job.s3_key = key
+            job.status = ExportStatus.COMPLETED
+        except Exception as e:
+            session.rollback()
+            job = session.get(ExportJob, uuid.UUID(job_id))
+            job.status = ExportStatus.FAILED
+            job.error = str(e)
+        job.completed_at = datetime.datetime.now(datetime.timezone.utc)
+        session.commit()
+        status = job.status.value
+
+    engine.dispose()
+    return {"status": status, "job_id": job_id}
+
+
+@celery_app.task
+def generate_thumbnail(file_id: str):
+    """Render a THUMBNAIL_SIZE JPEG preview of an image attachment and store it beside the original.
+    Deduplicated files share an S3 key, so an existing thumbnail object is reused."""
+    import io
+    import uuid
+    from PIL import Image
+    from botocore.exceptions import ClientError
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from app.models import File
+    from app.storage import get_s3_client, thumbnail_key_for, THUMBNAIL_CONTENT_TYPES
+
+    engine = create_engine(settings.sync_database_url)
+    s3 = get_s3_client()
+
+    with Session(engine) as session:
+        file = session.get(File, uuid.UUID(file_id))
+        if not file or file.content_type not in THUMBNAIL_CONTENT_TYPES:
+            engine.dispose()
+            return {"status": "skipped", "file_id": file_id}
+
+        key = thumbnail_key_for(file.s3_key)
+        try:
+            s3.head_object(Bucket=settings.AWS_BUCKET, Key=key)
+            exists = True
+        except ClientError:
+            exists = False
+
+        if not exists:
+            original = s3.get_object(Bucket=settings.AWS_BUCKET, Key=file.s3_key)["Body"].read()
+            size = (settings.THUMBNAIL_SIZE, settings.THUMBNAIL_SIZE)
+            with Image.open(io.BytesIO(original)) as img:
+                img.draft("RGB", size)  # JPEG: decode at reduced scale
+                img.thumbnail(size)
+                # JPEG has no alpha channel; flatten transparent PNG/GIF onto white
+                img = img.convert("RGBA")
+                flattened = Image.new("RGB", img.size, (255, 255, 255))
+                flattened.paste(img, mask=img.getchannel("A"))
+                out = io.BytesIO()
+                flattened.save(out, "JPEG", quality=80, optimize=True)
+            s3.put_object(Bucket=settings.AWS_BUCKET, Key=key, Body=out.getvalue(), ContentType="image/jpeg")
+
+        file.thumbnail_key = key
         session.commit()
 
     engine.dispose()
-    return {"status": "processed", "marked_overdue": marked, "notifications_sent": notified}
+    return {"status": "generated" if not exists else "reused", "file_id": file_id}
@@ -9,6 +9,7 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "change-me"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440
+    PASSWORD_HASH_WORKERS: int = 4
 
     DB_HOST: str = "localhost"
     DB_PORT: int = 5433
@@ -22,11 +23,24 @@ class Settings(BaseSettings):
     REDIS_USER: str = ""
     REDIS_PASSWORD: str = ""
 
+    CACHE_L1_MAX_ENTRIES: int = 1024
+    CACHE_L1_MAX_BYTES: int = 33554432
+    CACHE_L1_TTL: int = 30
+    CACHE_GENERATION_TTL: int = 5
+    USER_CACHE_TTL: int = 60
+
     AWS_ACCESS_KEY_ID: str = ""
     AWS_SECRET_ACCESS_KEY: str = ""
     AWS_BUCKET: str = ""
     AWS_REGION: str = ""
     CUSTOM_S3_ENDPOINT_URL: str = ""
+    S3_MAX_POOL_CONNECTIONS: int = 50
+    S3_MULTIPART_CHUNK_SIZE: int = 8388608
+    PRESIGNED_UPLOAD_EXPIRY: int = 900
+    UPLOAD_CONCURRENCY: int = 4
+    THUMBNAIL_SIZE: int = 256
+    FILE_DOWNLOAD_MODE: str = "proxy"  # "proxy" streams through the API, "redirect" sends a presigned URL
+    EXPORT_JOB_TIMEOUT: int = 1800
 
     CORS_ORIGINS: str = "http://localhost:5173,http://localhost:3000,https://task-react-frontend.vercel.app,https://task-react-frontend-jbq1409ak-mohd-hasnains-projects.vercel.app,https://task-py-backend.onrender.com"
 
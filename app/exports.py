@@ -0,0 +1,75 @@
+import csv
+import io
+import json
+from sqlalchemy import select, func
+from openpyxl import Workbook
+from app.models import Task
+
+EXPORT_COLUMNS = ["ID", "Title", "Description", "Status", "Priority", "Due Date", "Created At"]
+EXPORT_BATCH_SIZE = 1000
+EXPORT_MEDIA_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def export_query():
+    """Only the exported columns, fetched in batches through a server-side cursor."""
+    return (
+        select(Task.id, Task.title, Task.description, Task.status, Task.priority, Task.due_date, Task.created_at)
+        .where(Task.is_deleted == False)
+        .order_by(Task.created_at.desc())
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+
+def data_version_query():
+    """Changes whenever a task is created, updated or soft-deleted (soft deletes bump updated_at)."""
+    return select(func.count(Task.id), func.max(Task.updated_at))
+
+
+def format_data_version(count: int, last_updated) -> str:
+    return f"{count}:{last_updated.isoformat() if last_updated else '-'}"
+
+
+def export_row(row) -> list:
+    return [
+        str(row.id), row.title, row.description or "",
+        row.status.value, row.priority.value,
+        str(row.due_date) if row.due_date else "",
+        str(row.created_at),
+    ]
+
+
+def ndjson_line(row) -> str:
+    return json.dumps({
+        "id": str(row.id),
+        "title": row.title,
+        "description": row.description,
+        "status": row.status.value,
+        "priority": row.priority.value,
+        "due_date": row.due_date.isoformat() if row.due_date else None,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+    }) + "\n"
+
+
+def write_export(rows, fmt: str, fileobj):
+    """Write rows to a binary file object without holding the whole export in memory."""
+    if fmt == "xlsx":
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Tasks")
+        ws.append(EXPORT_COLUMNS)
+        for row in rows:
+            ws.append(export_row(row))
+        wb.save(fileobj)
+    elif fmt == "csv":
+        text = io.TextIOWrapper(fileobj, encoding="utf-8", newline="", write_through=True)
+        writer = csv.writer(text)
+        writer.writerow(EXPORT_COLUMNS)
+        for row in rows:
+            writer.writerow(export_row(row))
+        text.detach()
+    else:
+        for row in rows:
+            fileobj.write(ndjson_line(row).encode())
@@ -6,10 +6,10 @@ from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from app.config import settings
 from app.database import init_db
-from app.cache import close_redis
+from app.cache import close_redis, start_invalidation_listener, cache_invalidate
 from app.websocket import manager
-from app.auth import get_current_user
-from app.routes import auth, tasks, comments, files, analytics, notifications
+from app.auth import get_current_user, password_pool_stats
+from app.routes import auth, tasks, comments, files, analytics, notifications, search
 from jose import jwt
 
 
@@ -19,6 +19,7 @@ limiter = Limiter(key_func=get_remote_address)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    start_invalidation_listener()
     # Auto-transition task statuses on startup
     try:
         from app.database import async_session
@@ -69,6 +70,7 @@ async def lifespan(app: FastAPI):
             )
 
             await session.commit()
+        await cache_invalidate("tasks", "analytics")
     except Exception:
         pass  # Don't block startup
     yield
@@ -101,11 +103,17 @@ app.include_router(comments.router)
 app.include_router(files.router)
 app.include_router(analytics.router)
 app.include_router(notifications.router)
+app.include_router(search.router)
 
 
 @app.get("/api/health")
 async def health():
-    return {"status": "ok", "app": settings.APP_NAME, "version": settings.APP_VERSION}
+    return {
+        "status": "ok",
+        "app": settings.APP_NAME,
+        "version": settings.APP_VERSION,
+        "password_pool": password_pool_stats(),
+    }
 
 
 @app.websocket("/ws/{token}")
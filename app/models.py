@@ -1,10 +1,10 @@
 import uuid
 import datetime
 from sqlalchemy import (
-    Column, String, Text, Boolean, DateTime, Integer, ForeignKey, Table, Enum as SAEnum, Index, func
+    Column, String, Text, Boolean, DateTime, Integer, ForeignKey, Table, Enum as SAEnum, Index, Computed, func
 )
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from app.database import Base
 import enum
 
@@ -48,6 +48,14 @@ class User(Base):
     tasks_assigned = relationship("Task", back_populates="assignee", foreign_keys="Task.assigned_to")
     comments = relationship("Comment", back_populates="author")
 
+    __table_args__ = (
+        Index("ix_users_username_trgm", "username", postgresql_using="gin", postgresql_ops={"username": "gin_trgm_ops"}),
+        Index("ix_users_full_name_trgm", "full_name", postgresql_using="gin", postgresql_ops={"full_name": "gin_trgm_ops"}),
+        # Anchored lower(col) LIKE 'q%' lookups for short typeahead queries
+        Index("ix_users_username_prefix", func.lower(username).label("username_lower"), postgresql_ops={"username_lower": "text_pattern_ops"}),
+        Index("ix_users_full_name_prefix", func.lower(full_name).label("full_name_lower"), postgresql_ops={"full_name_lower": "text_pattern_ops"}),
+    )
+
 
 class Tag(Base):
     __tablename__ = "tags"
@@ -59,6 +67,11 @@ class Tag(Base):
 
     tasks = relationship("Task", secondary=task_tags, back_populates="tags")
 
+    __table_args__ = (
+        Index("ix_tags_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_tags_name_prefix", func.lower(name).label("name_lower"), postgresql_ops={"name_lower": "text_pattern_ops"}),
+    )
+
 
 class Task(Base):
     __tablename__ = "tasks"
@@ -76,6 +89,14 @@ class Task(Base):
     assigned_to = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Watermark for /api/tasks/changes: also bumped by tag, comment and file changes, which leave updated_at alone
+    changed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Maintained by Postgres; title terms rank above description terms
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+        persisted=True,
+    )))
 
     creator = relationship("User", back_populates="tasks_created", foreign_keys=[created_by])
     assignee = relationship("User", back_populates="tasks_assigned", foreign_keys=[assigned_to])
@@ -87,7 +108,18 @@ class Task(Base):
         Index("ix_tasks_status_priority", "status", "priority"),
         Index("ix_tasks_created_by_status", "created_by", "status"),
         Index("ix_tasks_assigned_to_status", "assigned_to", "status"),
-        Index("ix_tasks_due_date", "due_date"),
+        # (sort column, id) composites back cursor pagination's row-comparison seek
+        Index("ix_tasks_created_at_id", "created_at", "id"),
+        Index("ix_tasks_updated_at_id", "updated_at", "id"),
+        Index("ix_tasks_changed_at_id", "changed_at", "id"),
+        Index("ix_tasks_due_date_id", "due_date", "id"),
+        Index("ix_tasks_title_id", "title", "id"),
+        Index("ix_tasks_priority_id", "priority", "id"),
+        Index("ix_tasks_status_id", "status", "id"),
+        Index("ix_tasks_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_tasks_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        Index("ix_tasks_title_prefix", func.lower(title).label("title_lower"), postgresql_ops={"title_lower": "text_pattern_ops"}),
+        Index("ix_tasks_description_trgm", "description", postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"}),
     )
 
 
@@ -107,6 +139,18 @@ class Comment(Base):
     author = relationship("User", back_populates="comments")
 
 
+class FileBlob(Base):
+    """One stored S3 object per distinct content, shared by every File with the same SHA-256."""
+    __tablename__ = "file_blobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    sha256 = Column(String(64), unique=True, nullable=False)
+    s3_key = Column(String(500), nullable=False)
+    size = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
 class File(Base):
     __tablename__ = "files"
 
@@ -118,10 +162,13 @@ class File(Base):
     s3_key = Column(String(500), nullable=False)
     task_id = Column(UUID(as_uuid=True), ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False, index=True)
     uploaded_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    blob_id = Column(UUID(as_uuid=True), ForeignKey("file_blobs.id"), nullable=True, index=True)
+    thumbnail_key = Column(String(500), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     task = relationship("Task", back_populates="files")
     uploader = relationship("User")
+    blob = relationship("FileBlob")
 
 
 class NotificationType(str, enum.Enum):
@@ -144,3 +191,30 @@ class Notification(Base):
 
     user = relationship("User")
     task = relationship("Task")
+
+
+class ExportStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ExportJob(Base):
+    __tablename__ = "export_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    format = Column(String(10), nullable=False)
+    status = Column(SAEnum(ExportStatus), default=ExportStatus.PENDING, nullable=False)
+    data_version = Column(String(100), nullable=False)
+    s3_key = Column(String(500), nullable=True)
+    error = Column(Text, nullable=True)
+    requested_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    requester = relationship("User")
+
+    __table_args__ = (
+        Index("ix_export_jobs_format_version", "format", "data_version"),
+    )
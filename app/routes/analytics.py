@@ -1,15 +1,27 @@
+import csv
 import json
 import io
+import uuid
+import tempfile
+from typing import Optional
 from datetime import datetime, timedelta, timezone
-from fastapi import APIRouter, Depends, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, case, and_, extract
-from app.database import get_db
-from app.models import Task, User, TaskStatus, TaskPriority
-from app.schemas import TaskOverview, UserPerformance, TaskTrend
+from sqlalchemy import select, func, case, and_, or_, desc, extract
+from app.database import get_db, async_session
+from app.models import Task, User, TaskStatus, TaskPriority, ExportJob, ExportStatus
+from app.schemas import TaskOverview, UserPerformance, TaskTrend, ExportJobCreate, ExportJobResponse
 from app.auth import get_current_user
-from app.cache import cache_get, cache_set
+from app.config import settings
+from app.cache import cache_get, cache_set, cache_versioned_key
+from app.storage import generate_presigned_url
+from app.exports import (
+    EXPORT_COLUMNS, EXPORT_BATCH_SIZE, EXPORT_MEDIA_TYPES, export_query, export_row, ndjson_line,
+    data_version_query, format_data_version,
+)
+from app.celery_worker import generate_task_export
 from openpyxl import Workbook
 
 router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
@@ -17,74 +29,90 @@ router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
 
 @router.get("/overview", response_model=TaskOverview)
 async def get_overview(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
-    cached = await cache_get(f"analytics:overview:{current_user.id}")
+    cache_key = await cache_versioned_key("analytics", f"overview:{current_user.id}")
+    cached = await cache_get(cache_key)
     if cached:
-        return TaskOverview.model_validate_json(cached)
+        return Response(content=cached, media_type="application/json")
 
-    now = datetime.now(timezone.utc)
-
-    # Real-time status transitions before counting
-    from sqlalchemy import update as sql_update
-    await db.execute(
-        sql_update(Task)
-        .where(Task.due_date < now, Task.status.notin_([TaskStatus.COMPLETED, TaskStatus.OVERDUE]), Task.is_deleted == False)
-        .values(status=TaskStatus.OVERDUE)
-    )
-    await db.execute(
-        sql_update(Task)
-        .where(Task.start_date <= now, Task.status == TaskStatus.TODO, Task.is_deleted == False)
-        .values(status=TaskStatus.IN_PROGRESS)
+    # One aggregate pass; status transitions are handled by the Celery beat job, not on read
+    result = await db.execute(
+        select(Task.status, Task.priority, func.count())
+        .where(Task.is_deleted == False)
+        .group_by(Task.status, Task.priority)
     )
-    await db.flush()
-
-    base = select(Task).where(Task.is_deleted == False)
+    by_status = {s.value: 0 for s in TaskStatus}
+    by_priority = {}
+    for task_status, priority, count in result.all():
+        by_status[task_status.value] += count
+        by_priority[priority.value] = by_priority.get(priority.value, 0) + count
 
-    total = (await db.execute(select(func.count()).select_from(base.subquery()))).scalar()
-    completed = (await db.execute(select(func.count()).select_from(base.where(Task.status == TaskStatus.COMPLETED).subquery()))).scalar()
-    in_progress = (await db.execute(select(func.count()).select_from(base.where(Task.status == TaskStatus.IN_PROGRESS).subquery()))).scalar()
-    todo = (await db.execute(select(func.count()).select_from(base.where(Task.status == TaskStatus.TODO).subquery()))).scalar()
-    overdue = (await db.execute(select(func.count()).select_from(
-        base.where(Task.status == TaskStatus.OVERDUE).subquery()
-    ))).scalar()
-
-    by_status = {"todo": todo, "in_progress": in_progress, "completed": completed, "overdue": overdue}
-
-    priority_result = await db.execute(
-        select(Task.priority, func.count()).where(Task.is_deleted == False).group_by(Task.priority)
-    )
-    by_priority = {str(row[0].value): row[1] for row in priority_result.all()}
+    total = sum(by_status.values())
+    completed = by_status["completed"]
+    in_progress = by_status["in_progress"]
+    todo = by_status["todo"]
+    overdue = by_status["overdue"]
 
     overview = TaskOverview(
         total_tasks=total, completed=completed, in_progress=in_progress,
         todo=todo, overdue=overdue, by_priority=by_priority, by_status=by_status,
     )
-    await cache_set(f"analytics:overview:{current_user.id}", overview.model_dump_json(), ttl=120)
+    await cache_set(cache_key, overview.model_dump_json(), ttl=120)
     return overview
 
 
 @router.get("/performance", response_model=list[UserPerformance])
-async def get_performance(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
-    cached = await cache_get("analytics:performance")
+async def get_performance(
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    sort: Optional[str] = Query(None, pattern="^(completion_rate|completed|in_progress|total_assigned|username)$"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    cache_key = await cache_versioned_key("analytics", f"performance:{sort}:{limit}")
+    cached = await cache_get(cache_key)
     if cached:
-        return json.loads(cached)
-
-    users_result = await db.execute(select(User).where(User.is_active == True))
-    users = users_result.scalars().all()
+        return Response(content=cached, media_type="application/json")
 
-    performances = []
-    for user in users:
-        base = select(Task).where(Task.assigned_to == user.id, Task.is_deleted == False)
-        total_assigned = (await db.execute(select(func.count()).select_from(base.subquery()))).scalar()
-        completed = (await db.execute(select(func.count()).select_from(base.where(Task.status == TaskStatus.COMPLETED).subquery()))).scalar()
-        prog = (await db.execute(select(func.count()).select_from(base.where(Task.status == TaskStatus.IN_PROGRESS).subquery()))).scalar()
+    # Single LEFT JOIN + GROUP BY so users with no assigned tasks still show up with zeroes
+    total_assigned = func.count(Task.id)
+    completed = func.count(Task.id).filter(Task.status == TaskStatus.COMPLETED)
+    in_progress = func.count(Task.id).filter(Task.status == TaskStatus.IN_PROGRESS)
+    completion_rate = case(
+        (total_assigned > 0, func.round(completed * 100.0 / total_assigned, 1)),
+        else_=0,
+    )
+    query = (
+        select(
+            User.id, User.username, User.full_name,
+            total_assigned.label("total_assigned"),
+            completed.label("completed"),
+            in_progress.label("in_progress"),
+            completion_rate.label("completion_rate"),
+        )
+        .outerjoin(Task, and_(Task.assigned_to == User.id, Task.is_deleted == False))
+        .where(User.is_active == True)
+        .group_by(User.id)
+    )
+    # A leaderboard needs a stable order before LIMIT applies; default to the top completion rates
+    if limit and not sort:
+        sort = "completion_rate"
+    if sort == "username":
+        query = query.order_by(User.username)
+    elif sort:
+        query = query.order_by(desc(sort), User.username)
+    if limit:
+        query = query.limit(limit)
 
-        performances.append(UserPerformance(
-            user_id=user.id, username=user.username, full_name=user.full_name,
-            total_assigned=total_assigned, completed=completed, in_progress=prog,
-            completion_rate=round((completed / total_assigned * 100), 1) if total_assigned > 0 else 0,
-        ))
+    result = await db.execute(query)
+    performances = [
+        UserPerformance(
+            user_id=row.id, username=row.username, full_name=row.full_name,
+            total_assigned=row.total_assigned, completed=row.completed, in_progress=row.in_progress,
+            completion_rate=float(row.completion_rate),
+        )
+        for row in result.all()
+    ]
 
-    await cache_set("analytics:performance", json.dumps([p.model_dump(mode="json") for p in performances]), ttl=120)
+    await cache_set(cache_key, json.dumps([p.model_dump(mode="json") for p in performances]), ttl=120)
     return performances
 
 
@@ -94,9 +122,10 @@ async def get_trends(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    cached = await cache_get(f"analytics:trends:{days}")
+    cache_key = await cache_versioned_key("analytics", f"trends:{days}")
+    cached = await cache_get(cache_key)
     if cached:
-        return json.loads(cached)
+        return Response(content=cached, media_type="application/json")
 
     now = datetime.now(timezone.utc)
     start = now - timedelta(days=days)
@@ -122,34 +151,127 @@ async def get_trends(
         date_str = str((start + timedelta(days=i)).date())
         trends.append(TaskTrend(date=date_str, created=created_map.get(date_str, 0), completed=completed_map.get(date_str, 0)))
 
-    await cache_set(f"analytics:trends:{days}", json.dumps([t.model_dump() for t in trends]), ttl=120)
+    await cache_set(cache_key, json.dumps([t.model_dump() for t in trends]), ttl=120)
     return trends
 
 
-@router.get("/export")
-async def export_tasks(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
-    result = await db.execute(select(Task).where(Task.is_deleted == False).order_by(Task.created_at.desc()))
-    tasks = result.scalars().all()
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Tasks"
-    ws.append(["ID", "Title", "Description", "Status", "Priority", "Due Date", "Created At"])
-
-    for task in tasks:
-        ws.append([
-            str(task.id), task.title, task.description or "",
-            task.status.value, task.priority.value,
-            str(task.due_date) if task.due_date else "",
-            str(task.created_at),
-        ])
-
-    buffer = io.BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
+async def _iter_export_rows():
+    """Yield exported task rows through a server-side cursor, loading only the exported columns.
+    Opens its own session since the request-scoped one is closed before a streamed body runs."""
+    async with async_session() as session:
+        result = await session.stream(export_query())
+        async for row in result:
+            yield row
+
+
+async def _stream_xlsx():
+    # Write-only workbooks spill rows to a temp file instead of keeping cells in memory
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Tasks")
+    ws.append(EXPORT_COLUMNS)
+    async for row in _iter_export_rows():
+        ws.append(export_row(row))
+
+    with tempfile.TemporaryFile() as tmp:
+        await run_in_threadpool(wb.save, tmp)
+        tmp.seek(0)
+        while chunk := tmp.read(64 * 1024):
+            yield chunk
+
+
+async def _stream_csv():
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    count = 0
+    async for row in _iter_export_rows():
+        writer.writerow(export_row(row))
+        count += 1
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    yield buffer.getvalue()
 
+
+async def _stream_ndjson():
+    async for row in _iter_export_rows():
+        yield ndjson_line(row)
+
+
+@router.get("/export")
+async def export_tasks(
+    format: str = Query("xlsx", pattern="^(xlsx|csv|ndjson)$"),
+    current_user: User = Depends(get_current_user),
+):
+    streams = {"xlsx": _stream_xlsx, "csv": _stream_csv, "ndjson": _stream_ndjson}
     return StreamingResponse(
-        buffer,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.document",
-        headers={"Content-Disposition": "attachment; filename=tasks_export.xlsx"},
+        streams[format](),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=tasks_export.{format}"},
     )
+
+
+def _export_job_response(job: ExportJob) -> ExportJobResponse:
+    response = ExportJobResponse.model_validate(job)
+    if job.status == ExportStatus.COMPLETED and job.s3_key:
+        response.download_url = generate_presigned_url(job.s3_key)
+    return response
+
+
+@router.post("/export/jobs", response_model=ExportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_export_job(
+    data: ExportJobCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    count, last_updated = (await db.execute(data_version_query())).one()
+    data_version = format_data_version(count, last_updated)
+
+    # Unchanged data: hand back the finished (or in-flight) export instead of generating it again.
+    # Jobs stuck pending/running past EXPORT_JOB_TIMEOUT (lost task, dead worker) are not reused.
+    stale_before = datetime.now(timezone.utc) - timedelta(seconds=settings.EXPORT_JOB_TIMEOUT)
+    existing = await db.execute(
+        select(ExportJob)
+        .where(
+            ExportJob.format == data.format,
+            ExportJob.data_version == data_version,
+            or_(
+                ExportJob.status == ExportStatus.COMPLETED,
+                and_(
+                    ExportJob.status.in_([ExportStatus.PENDING, ExportStatus.RUNNING]),
+                    ExportJob.created_at > stale_before,
+                ),
+            ),
+        )
+        .order_by(ExportJob.created_at.desc())
+        .limit(1)
+    )
+    job = existing.scalar_one_or_none()
+    if job:
+        return _export_job_response(job)
+
+    job = ExportJob(format=data.format, data_version=data_version, requested_by=current_user.id)
+    db.add(job)
+    await db.flush()
+    await db.refresh(job)
+    # Commit before dispatching so the worker can see the row
+    await db.commit()
+    try:
+        generate_task_export.delay(str(job.id))
+    except Exception as e:
+        job.status = ExportStatus.FAILED
+        job.error = f"Could not queue export: {e}"
+        job.completed_at = datetime.now(timezone.utc)
+        await db.commit()
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Export queue unavailable")
+    return _export_job_response(job)
+
+
+@router.get("/export/jobs/{job_id}", response_model=ExportJobResponse)
+async def get_export_job(job_id: uuid.UUID, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    result = await db.execute(select(ExportJob).where(ExportJob.id == job_id))
+    job = result.scalar_one_or_none()
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return _export_job_response(job)
@@ -4,7 +4,7 @@ from sqlalchemy import select
 from app.database import get_db
 from app.models import User
 from app.schemas import UserCreate, UserLogin, UserResponse, TokenResponse, UserUpdate
-from app.auth import hash_password, verify_password, create_access_token, get_current_user
+from app.auth import hash_password, verify_password, create_access_token, get_current_user, invalidate_user_cache
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
@@ -19,7 +19,7 @@ async def register(data: UserCreate, db: AsyncSession = Depends(get_db)):
         email=data.email,
         username=data.username,
         full_name=data.full_name,
-        hashed_password=hash_password(data.password),
+        hashed_password=await hash_password(data.password),
     )
     db.add(user)
     await db.flush()
@@ -33,7 +33,7 @@ async def register(data: UserCreate, db: AsyncSession = Depends(get_db)):
 async def login(data: UserLogin, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.email == data.email))
     user = result.scalar_one_or_none()
-    if not user or not verify_password(data.password, user.hashed_password):
+    if not user or not await verify_password(data.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid email or password")
     if not user.is_active:
         raise HTTPException(status_code=403, detail="Account is disabled")
@@ -49,13 +49,19 @@ async def get_profile(current_user: User = Depends(get_current_user)):
 
 @router.put("/me", response_model=UserResponse)
 async def update_profile(data: UserUpdate, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    # current_user may be a detached copy from the principal cache, so load the row to update it
+    result = await db.execute(select(User).where(User.id == current_user.id))
+    user = result.scalar_one()
     if data.full_name is not None:
-        current_user.full_name = data.full_name
+        user.full_name = data.full_name
     if data.avatar_url is not None:
-        current_user.avatar_url = data.avatar_url
+        user.avatar_url = data.avatar_url
     await db.flush()
-    await db.refresh(current_user)
-    return UserResponse.model_validate(current_user)
+    await db.refresh(user)
+    # Commit first so a concurrent request can't re-cache the old row after we invalidate
+    await db.commit()
+    await invalidate_user_cache(user.id)
+    return UserResponse.model_validate(user)
 
 
 @router.get("/users", response_model=list[UserResponse])
@@ -9,6 +9,7 @@ from app.database import get_db
 from app.models import Comment, Task, User
 from app.schemas import CommentCreate, CommentUpdate, CommentResponse
 from app.auth import get_current_user
+from app.routes.tasks import touch_task
 from app.websocket import manager
 
 router = APIRouter(prefix="/api/tasks/{task_id}/comments", tags=["Comments"])
@@ -37,6 +38,7 @@ async def add_comment(task_id: uuid.UUID, data: CommentCreate, db: AsyncSession
     )
     db.add(comment)
     await db.flush()
+    await touch_task(db, task_id)
     await db.refresh(comment, ["author"])
 
     await manager.broadcast({
@@ -88,3 +90,4 @@ async def delete_comment(task_id: uuid.UUID, comment_id: uuid.UUID, db: AsyncSes
 
     comment.is_deleted = True
     await db.flush()
+    await touch_task(db, task_id)
@@ -1,20 +1,44 @@
 import uuid
+import asyncio
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File as FastAPIFile, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File as FastAPIFile, status
+from fastapi.responses import RedirectResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, delete, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.database import get_db
-from app.models import File, Task, User
-from app.schemas import FileResponse
+from app.models import File, FileBlob, Task, User
+from app.schemas import FileResponse, FileUploadRequest, FileUploadTicket, FileUploadFinalize
 from app.auth import get_current_user
 from app.config import settings
-from app.storage import upload_file_to_s3, get_file_from_s3, delete_file_from_s3
-import io
+from app.celery_worker import generate_thumbnail
+from app.routes.tasks import touch_task
+from app.storage import (
+    stream_upload_to_s3, hash_upload, blob_key, thumbnail_key_for, THUMBNAIL_CONTENT_TYPES, open_s3_object, iter_s3_body, head_s3_object, delete_file_from_s3,
+    generate_presigned_url, generate_presigned_upload, is_direct_upload_key,
+    FileTooLargeError, InvalidRangeError,
+)
 
 router = APIRouter(prefix="/api/tasks/{task_id}/files", tags=["Files"])
 
 
+def _file_too_large(filename: str) -> HTTPException:
+    return HTTPException(status_code=400, detail=f"File {filename} exceeds maximum size of {settings.MAX_FILE_SIZE} bytes")
+
+
+async def _queue_thumbnails(db: AsyncSession, db_files: List[File]):
+    # Commit first so the worker can see the new rows
+    images = [f for f in db_files if f.content_type in THUMBNAIL_CONTENT_TYPES]
+    if not images:
+        return
+    await db.commit()
+    for f in images:
+        try:
+            generate_thumbnail.delay(str(f.id))
+        except Exception:
+            pass  # The upload is committed; a missing preview isn't worth failing it (and inviting duplicate retries)
+
+
 @router.post("", response_model=list[FileResponse], status_code=status.HTTP_201_CREATED)
 async def upload_files(
     task_id: uuid.UUID,
@@ -27,32 +51,141 @@ async def upload_files(
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    uploaded = []
     for file in files:
         if file.content_type not in settings.allowed_file_types_list:
             raise HTTPException(status_code=400, detail=f"File type {file.content_type} not allowed")
+        if file.size is not None and file.size > settings.MAX_FILE_SIZE:
+            raise _file_too_large(file.filename)
+
+    semaphore = asyncio.Semaphore(settings.UPLOAD_CONCURRENCY)
 
-        content = await file.read()
-        if len(content) > settings.MAX_FILE_SIZE:
-            raise HTTPException(status_code=400, detail=f"File {file.filename} exceeds maximum size of {settings.MAX_FILE_SIZE} bytes")
+    async def hash_file(file: UploadFile):
+        async with semaphore:
+            try:
+                return await hash_upload(file, settings.MAX_FILE_SIZE)
+            except FileTooLargeError:
+                raise _file_too_large(file.filename)
 
-        s3_key = await upload_file_to_s3(content, file.filename, file.content_type)
+    async def upload(file: UploadFile, digest: str):
+        async with semaphore:
+            await stream_upload_to_s3(file, file.filename, file.content_type, settings.MAX_FILE_SIZE, key=blob_key(digest))
 
-        db_file = File(
-            filename=s3_key.split("/")[-1],
-            original_filename=file.filename,
-            content_type=file.content_type,
-            size=len(content),
-            s3_key=s3_key,
-            task_id=task_id,
-            uploaded_by=current_user.id,
+    # Content addressing: hash locally, then only send bytes S3 doesn't already have
+    hashes = await asyncio.gather(*(hash_file(f) for f in files))
+    digests = [digest for digest, _ in hashes]
+    sizes = {digest: size for digest, size in hashes}
+    counts = {digest: digests.count(digest) for digest in sizes}
+
+    # Claim the blob rows before uploading. A row this transaction inserted is ours to upload (and to
+    # clean up); concurrent uploads of the same digest block on it until we commit or roll back.
+    # Sorted so concurrent batches take the row locks in the same order.
+    stmt = pg_insert(FileBlob).values([
+        {"sha256": d, "s3_key": blob_key(d), "size": sizes[d], "ref_count": counts[d]} for d in sorted(counts)
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[FileBlob.sha256],
+        set_={"ref_count": FileBlob.ref_count + stmt.excluded.ref_count},
+    ).returning(FileBlob.id, FileBlob.sha256, literal_column("xmax = 0").label("inserted"))
+    blob_rows = (await db.execute(stmt)).all()
+    blob_ids = {row.sha256: row.id for row in blob_rows}
+    owned = [row.sha256 for row in blob_rows if row.inserted]
+
+    try:
+        # Upload concurrently (bounded), then record the file rows in one round
+        results = await asyncio.gather(
+            *(upload(files[digests.index(d)], d) for d in owned), return_exceptions=True
         )
-        db.add(db_file)
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            raise errors[0]
+
+        db_files = [
+            File(
+                filename=digest,
+                original_filename=file.filename,
+                content_type=file.content_type,
+                size=sizes[digest],
+                s3_key=blob_key(digest),
+                blob_id=blob_ids[digest],
+                task_id=task_id,
+                uploaded_by=current_user.id,
+            )
+            for file, digest in zip(files, digests)
+        ]
+        db.add_all(db_files)
         await db.flush()
-        await db.refresh(db_file)
-        uploaded.append(db_file)
+        await touch_task(db, task_id)
+    except BaseException:
+        # Roll back the partial batch: the blob rows go with the transaction, the objects we uploaded here
+        await asyncio.gather(*(delete_file_from_s3(blob_key(d)) for d in owned), return_exceptions=True)
+        raise
+
+    await _queue_thumbnails(db, db_files)
+    result = await db.execute(select(File).where(File.id.in_([f.id for f in db_files])).order_by(File.created_at))
+    return [FileResponse.model_validate(f) for f in result.scalars().all()]
+
+
+@router.post("/presign", response_model=FileUploadTicket)
+async def presign_upload(
+    task_id: uuid.UUID,
+    data: FileUploadRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Step 1 of a direct upload: the client POSTs the file to the returned url/fields, then calls /finalize."""
+    result = await db.execute(select(Task.id).where(Task.id == task_id, Task.is_deleted == False))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if data.content_type not in settings.allowed_file_types_list:
+        raise HTTPException(status_code=400, detail=f"File type {data.content_type} not allowed")
+    if data.size > settings.MAX_FILE_SIZE:
+        raise _file_too_large(data.filename)
+
+    ticket = generate_presigned_upload(task_id, data.filename, data.content_type, settings.MAX_FILE_SIZE, settings.PRESIGNED_UPLOAD_EXPIRY)
+    return FileUploadTicket(**ticket, expires_in=settings.PRESIGNED_UPLOAD_EXPIRY)
 
-    return [FileResponse.model_validate(f) for f in uploaded]
+
+@router.post("/finalize", response_model=FileResponse, status_code=status.HTTP_201_CREATED)
+async def finalize_upload(
+    task_id: uuid.UUID,
+    data: FileUploadFinalize,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Step 2 of a direct upload: verify the object landed in the bucket and record it."""
+    result = await db.execute(select(Task.id).where(Task.id == task_id, Task.is_deleted == False))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if not is_direct_upload_key(data.key, task_id):
+        raise HTTPException(status_code=400, detail="Invalid upload key")
+    existing = await db.execute(select(File.id).where(File.s3_key == data.key))
+    if existing.first() is not None:
+        raise HTTPException(status_code=400, detail="Upload already finalized")
+
+    head = await head_s3_object(data.key)
+    if head is None:
+        raise HTTPException(status_code=400, detail="Uploaded object not found")
+    content_type = head.get("ContentType", "")
+    size = head["ContentLength"]
+    if content_type not in settings.allowed_file_types_list or size > settings.MAX_FILE_SIZE:
+        await delete_file_from_s3(data.key)
+        raise HTTPException(status_code=400, detail="Uploaded object failed validation")
+
+    db_file = File(
+        filename=data.key.split("/")[-1],
+        original_filename=data.original_filename,
+        content_type=content_type,
+        size=size,
+        s3_key=data.key,
+        task_id=task_id,
+        uploaded_by=current_user.id,
+    )
+    db.add(db_file)
+    await db.flush()
+    await touch_task(db, task_id)
+    await db.refresh(db_file)
+    await _queue_thumbnails(db, [db_file])
+    return FileResponse.model_validate(db_file)
 
 
 @router.get("", response_model=list[FileResponse])
@@ -62,17 +195,43 @@ async def list_files(task_id: uuid.UUID, db: AsyncSession = Depends(get_db), cur
 
 
 @router.get("/{file_id}")
-async def download_file(task_id: uuid.UUID, file_id: uuid.UUID, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def download_file(
+    task_id: uuid.UUID,
+    file_id: uuid.UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
     result = await db.execute(select(File).where(File.id == file_id, File.task_id == task_id))
     file = result.scalar_one_or_none()
     if not file:
         raise HTTPException(status_code=404, detail="File not found")
 
-    content = await get_file_from_s3(file.s3_key)
+    # Redirect mode: the object store serves the bytes directly
+    if settings.FILE_DOWNLOAD_MODE == "redirect":
+        url = generate_presigned_url(file.s3_key, download_filename=file.original_filename)
+        return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+
+    range_header = request.headers.get("range")
+    try:
+        obj = await open_s3_object(file.s3_key, range_header)
+    except InvalidRangeError:
+        raise HTTPException(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, detail="Invalid range")
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="{file.original_filename}"',
+        "Accept-Ranges": "bytes",
+        "Content-Length": str(obj["ContentLength"]),
+    }
+    status_code = status.HTTP_200_OK
+    if range_header and obj.get("ContentRange"):
+        headers["Content-Range"] = obj["ContentRange"]
+        status_code = status.HTTP_206_PARTIAL_CONTENT
     return StreamingResponse(
-        io.BytesIO(content),
+        iter_s3_body(obj["Body"]),
+        status_code=status_code,
         media_type=file.content_type,
-        headers={"Content-Disposition": f'attachment; filename="{file.original_filename}"'},
+        headers=headers,
     )
 
 
@@ -83,6 +242,24 @@ async def delete_file(task_id: uuid.UUID, file_id: uuid.UUID, db: AsyncSession =
     if not file:
         raise HTTPException(status_code=404, detail="File not found")
 
-    await delete_file_from_s3(file.s3_key)
     await db.delete(file)
     await db.flush()
+    await touch_task(db, task_id)
+    if file.blob_id is None:
+        await delete_file_from_s3(file.s3_key)
+        if file.thumbnail_key:
+            await delete_file_from_s3(file.thumbnail_key)
+        return
+
+    # Shared content: only the last reference removes the blob and its object
+    result = await db.execute(
+        update(FileBlob)
+        .where(FileBlob.id == file.blob_id)
+        .values(ref_count=FileBlob.ref_count - 1)
+        .returning(FileBlob.ref_count, FileBlob.s3_key)
+    )
+    remaining, key = result.one()
+    if remaining <= 0:
+        await db.execute(delete(FileBlob).where(FileBlob.id == file.blob_id))
+        await delete_file_from_s3(key)
+        await delete_file_from_s3(thumbnail_key_for(key))
@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, or_, case
+from app.database import get_db
+from app.models import Task, Tag, User
+from app.schemas import Suggestion, SuggestionResponse
+from app.auth import get_current_user
+from app.cache import cache_get, cache_set, cache_versioned_key
+
+router = APIRouter(prefix="/api/suggest", tags=["Search"])
+
+# pg_trgm extracts no trigrams from shorter strings, so its GIN indexes can't narrow those searches
+TRIGRAM_MIN_LENGTH = 3
+
+
+def _escape_like(q: str) -> str:
+    return q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _match(columns, q: str):
+    """Filter and ordering for one suggestion type. Short queries are anchored prefix matches on the
+    lower(col) text_pattern_ops indexes; longer ones also match mid-string through the trigram
+    indexes, ranking prefix matches first and the rest by similarity."""
+    escaped = _escape_like(q)
+    prefix = or_(*(func.lower(col).like(f"{escaped}%") for col in columns))
+    if len(q) < TRIGRAM_MIN_LENGTH:
+        return prefix, [func.lower(columns[0])]
+    condition = or_(*(col.ilike(f"%{escaped}%") for col in columns))
+    similarity = func.greatest(*(func.similarity(col, q) for col in columns)) if len(columns) > 1 else func.similarity(columns[0], q)
+    return condition, [case((prefix, 0), else_=1), similarity.desc()]
+
+
+@router.get("", response_model=SuggestionResponse)
+async def suggest(
+    q: str = Query(..., min_length=1, max_length=100),
+    types: str = Query("tasks,tags,users", pattern="^(tasks|tags|users)(,(tasks|tags|users))*$"),
+    limit: int = Query(5, ge=1, le=20),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Top-k id/label matches for autocomplete, cached per prefix under the tasks cache generation."""
+    q = q.strip().lower()
+    wanted = set(types.split(","))
+    cache_key = await cache_versioned_key("tasks", f"suggest:{','.join(sorted(wanted))}:{limit}:{q}")
+    cached = await cache_get(cache_key)
+    if cached:
+        return Response(content=cached, media_type="application/json")
+
+    response = SuggestionResponse()
+    if not q:
+        return response
+    if "tasks" in wanted:
+        condition, order = _match([Task.title], q)
+        result = await db.execute(
+            select(Task.id, Task.title).where(Task.is_deleted == False, condition).order_by(*order).limit(limit)
+        )
+        response.tasks = [Suggestion(id=r.id, label=r.title) for r in result.all()]
+    if "tags" in wanted:
+        condition, order = _match([Tag.name], q)
+        result = await db.execute(select(Tag.id, Tag.name).where(condition).order_by(*order).limit(limit))
+        response.tags = [Suggestion(id=r.id, label=r.name) for r in result.all()]
+    if "users" in wanted:
+        condition, order = _match([User.username, User.full_name], q)
+        result = await db.execute(
+            select(User.id, User.full_name).where(User.is_active == True, condition).order_by(*order).limit(limit)
+        )
+        response.users = [Suggestion(id=r.id, label=r.full_name) for r in result.all()]
+
+    await cache_set(cache_key, response.model_dump_json(), ttl=30)
+    return response
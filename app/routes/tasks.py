@@ -1,35 +1,90 @@
+import re
 import uuid
 import json
 import math
-from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import base64
+import datetime
+from typing import Optional, List, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_, and_, desc, asc
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, insert, update, func, or_, and_, desc, asc, tuple_, any_, bindparam
+from sqlalchemy.orm import selectinload, make_transient_to_detached
+from sqlalchemy.dialects.postgresql import insert as pg_insert, ARRAY, UUID as PGUUID
 from app.database import get_db
-from app.models import Task, Tag, User, Comment, Notification, NotificationType, TaskStatus, TaskPriority, task_tags
-from app.schemas import TaskCreate, TaskUpdate, TaskResponse, TaskListResponse, TaskBulkCreate, NotificationResponse
+from app.models import Task, Tag, User, Comment, File, Notification, NotificationType, TaskStatus, TaskPriority, task_tags
+from app.schemas import (
+    TaskCreate, TaskUpdate, TaskResponse, TaskListResponse, TaskSummary, TaskSummaryListResponse,
+    TaskBulkCreate, TaskBulkUpdate, TaskBulkDelete, TaskBulkResult, TaskChange, TaskChangesResponse, NotificationResponse,
+)
 from app.auth import get_current_user
-from app.cache import cache_get, cache_set, cache_delete_pattern
+from app.cache import cache_get, cache_set, cache_versioned_key, cache_invalidate
 from app.websocket import manager
 from app.celery_worker import send_email_notification
 
 router = APIRouter(prefix="/api/tasks", tags=["Tasks"])
 
 
+TAG_CACHE_MAX_ENTRIES = 10000
+# name -> column values of a committed Tag. Tags are never renamed or deleted, so entries stay valid.
+_tag_cache: dict[str, dict] = {}
+
+
+def _tag_values(row) -> dict:
+    return {"id": row.id, "name": row.name, "color": row.color, "created_at": row.created_at}
+
+
+def _remember_tags(db: AsyncSession, rows):
+    # Tags inserted by this (uncommitted) transaction would be bogus after a rollback
+    created = db.info.get("created_tag_names", set())
+    for row in rows:
+        if row.name in created:
+            continue
+        if len(_tag_cache) >= TAG_CACHE_MAX_ENTRIES:
+            _tag_cache.clear()
+        _tag_cache[row.name] = _tag_values(row)
+
+
+async def resolve_tags(db: AsyncSession, tag_names: List[str]) -> dict[str, dict]:
+    """Map normalised tag names to tag column values, creating missing tags. Hot tags come from
+    the in-process cache; the rest cost one IN lookup plus at most one multi-row upsert."""
+    names = list(dict.fromkeys(n.strip().lower() for n in tag_names if n.strip()))
+    found = {n: _tag_cache[n] for n in names if n in _tag_cache}
+    missing = [n for n in names if n not in found]
+    if not missing:
+        return found
+
+    columns = (Tag.id, Tag.name, Tag.color, Tag.created_at)
+    result = await db.execute(select(*columns).where(Tag.name.in_(missing)))
+    rows = result.all()
+    _remember_tags(db, rows)
+    found.update({r.name: _tag_values(r) for r in rows})
+    missing = [n for n in missing if n not in found]
+
+    if missing:
+        stmt = (
+            pg_insert(Tag)
+            .values([{"id": uuid.uuid4(), "name": n} for n in missing])
+            .on_conflict_do_nothing(index_elements=[Tag.name])
+            .returning(*columns)
+        )
+        rows = (await db.execute(stmt)).all()
+        db.info.setdefault("created_tag_names", set()).update(r.name for r in rows)
+        # Names another transaction created concurrently come back from neither statement above
+        raced = [n for n in missing if n not in {r.name for r in rows}]
+        if raced:
+            rows += (await db.execute(select(*columns).where(Tag.name.in_(raced)))).all()
+        found.update({r.name: _tag_values(r) for r in rows})
+
+    return {n: found[n] for n in names}
+
+
 async def get_or_create_tags(db: AsyncSession, tag_names: List[str]) -> List[Tag]:
     tags = []
-    for name in tag_names:
-        name = name.strip().lower()
-        if not name:
-            continue
-        result = await db.execute(select(Tag).where(Tag.name == name))
-        tag = result.scalar_one_or_none()
-        if not tag:
-            tag = Tag(name=name)
-            db.add(tag)
-            await db.flush()
-        tags.append(tag)
+    for values in (await resolve_tags(db, tag_names)).values():
+        # Attach without a SELECT: the values are complete, so nothing is lazy-loaded later
+        tag = Tag(**values)
+        make_transient_to_detached(tag)
+        tags.append(await db.merge(tag, load=False))
     return tags
 
 
@@ -44,6 +99,72 @@ def _compute_status(start_date, due_date):
     return TaskStatus.TODO
 
 
+def _encode_cursor(task: Task, sort_by: str, sort_order: str) -> str:
+    """Opaque keyset cursor: the sort column value of the last row plus its id."""
+    value = getattr(task, sort_by)
+    if isinstance(value, (TaskStatus, TaskPriority)):
+        value = value.value
+    elif isinstance(value, datetime.datetime):
+        value = value.isoformat()
+    payload = {"s": sort_by, "o": sort_order, "v": value, "id": str(task.id)}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort_by: str, sort_order: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        if payload["s"] != sort_by or payload["o"] != sort_order:
+            raise ValueError("cursor does not match sort")
+        value = payload["v"]
+        if value is not None:
+            if sort_by == "status":
+                value = TaskStatus(value)
+            elif sort_by == "priority":
+                value = TaskPriority(value)
+            elif sort_by in ("created_at", "updated_at", "due_date"):
+                value = datetime.datetime.fromisoformat(value)
+        return value, uuid.UUID(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+_NULLABLE_SORTS = {"due_date"}
+
+
+def _keyset_condition(sort_col, sort_order: str, value, last_id: uuid.UUID, nullable: bool = False):
+    """Seek past (value, last_id) in ORDER BY sort_col, id. Postgres sorts NULLs last
+    ascending and first descending, so nullable columns (due_date) need extra branches;
+    the others get a bare row comparison that can range-scan their (col, id) index."""
+    if sort_order == "desc":
+        if value is None:
+            return or_(and_(sort_col.is_(None), Task.id < last_id), sort_col.isnot(None))
+        return tuple_(sort_col, Task.id) < tuple_(value, last_id)
+    if value is None:
+        return and_(sort_col.is_(None), Task.id > last_id)
+    seek = tuple_(sort_col, Task.id) > tuple_(value, last_id)
+    return or_(seek, sort_col.is_(None)) if nullable else seek
+
+
+_SUMMARY_COLUMNS = (
+    Task.id, Task.title, Task.status, Task.priority, Task.start_date, Task.due_date,
+    Task.notify_overdue, Task.is_deleted, Task.created_by, Task.assigned_to,
+    Task.created_at, Task.updated_at,
+)
+
+
+def _summary_query():
+    """Scalar task columns plus comment/file counts computed in SQL, without loading relationships."""
+    comment_count = (
+        select(func.count(Comment.id))
+        .where(Comment.task_id == Task.id, Comment.is_deleted == False)
+        .correlate(Task)
+        .scalar_subquery()
+    )
+    file_count = select(func.count(File.id)).where(File.task_id == Task.id).correlate(Task).scalar_subquery()
+    return select(*_SUMMARY_COLUMNS, comment_count.label("comment_count"), file_count.label("file_count"))
+
+
 @router.post("", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
 async def create_task(data: TaskCreate, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
     # If user explicitly sets completed, honour it; otherwise compute from dates
@@ -66,8 +187,7 @@ async def create_task(data: TaskCreate, db: AsyncSession = Depends(get_db), curr
         task.tags = await get_or_create_tags(db, data.tags)
     db.add(task)
     await db.flush()
-    await cache_delete_pattern("tasks:*")
-    await cache_delete_pattern("analytics:*")
+    await cache_invalidate("tasks", "analytics")
 
     await manager.broadcast({"type": "task_created", "data": {"task_id": str(task.id), "title": task.title}})
 
@@ -85,49 +205,130 @@ async def create_task(data: TaskCreate, db: AsyncSession = Depends(get_db), curr
     return TaskResponse.model_validate(task)
 
 
-@router.post("/bulk", response_model=list[TaskResponse], status_code=status.HTTP_201_CREATED)
+@router.post("/bulk", response_model=list[TaskSummary], status_code=status.HTTP_201_CREATED)
 async def bulk_create_tasks(data: TaskBulkCreate, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
-    created = []
-    for t in data.tasks:
+    """Set-based import of up to MAX_BULK_TASKS tasks: the payload is validated up front, then tasks
+    and their tag links go in as executemany INSERTs (batched into multi-row VALUES by SQLAlchemy).
+    Returns compact summaries rather than fully loaded tasks."""
+    assignees = {t.assigned_to for t in data.tasks if t.assigned_to}
+    if assignees:
+        result = await db.execute(select(User.id).where(User.id.in_(assignees)))
+        unknown = assignees - set(result.scalars().all())
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown assignee(s): {', '.join(sorted(map(str, unknown)))}")
+
+    rows = []
+    for i, t in enumerate(data.tasks):
+        try:
+            priority = TaskPriority(t.priority) if t.priority else TaskPriority.MEDIUM
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"tasks[{i}]: invalid priority '{t.priority}'")
         if t.status and t.status == 'completed':
             initial_status = TaskStatus.COMPLETED
         else:
             initial_status = _compute_status(t.start_date, t.due_date)
-        task = Task(
-            title=t.title,
-            description=t.description,
-            status=initial_status,
-            priority=TaskPriority(t.priority) if t.priority else TaskPriority.MEDIUM,
-            start_date=t.start_date,
-            due_date=t.due_date,
-            notify_overdue=t.notify_overdue or False,
-            created_by=current_user.id,
-            assigned_to=t.assigned_to,
-        )
-        if t.tags:
-            task.tags = await get_or_create_tags(db, t.tags)
-        db.add(task)
-        await db.flush()
-        created.append(task.id)
+        rows.append({
+            "id": uuid.uuid4(),
+            "title": t.title,
+            "description": t.description,
+            "status": initial_status,
+            "priority": priority,
+            "start_date": t.start_date,
+            "due_date": t.due_date,
+            "notify_overdue": t.notify_overdue or False,
+            "is_deleted": False,
+            "created_by": current_user.id,
+            "assigned_to": t.assigned_to,
+        })
+
+    tags = await resolve_tags(db, [name for t in data.tasks for name in (t.tags or [])])
+
+    result = await db.execute(
+        insert(Task).returning(*_SUMMARY_COLUMNS, sort_by_parameter_order=True),
+        rows,
+    )
+    created = result.all()
 
-    await cache_delete_pattern("tasks:*")
-    await cache_delete_pattern("analytics:*")
+    links = [
+        {"task_id": row["id"], "tag_id": tags[name]["id"]}
+        for row, t in zip(rows, data.tasks)
+        for name in dict.fromkeys(n.strip().lower() for n in (t.tags or []) if n.strip())
+    ]
+    if links:
+        await db.execute(insert(task_tags), links)
 
-    # Re-query all created tasks with selectinload
-    refreshed = await db.execute(
-        select(Task).where(Task.id.in_(created)).options(
-            selectinload(Task.creator),
-            selectinload(Task.assignee),
-            selectinload(Task.tags),
-            selectinload(Task.files),
-            selectinload(Task.comments),
-        )
+    await cache_invalidate("tasks", "analytics")
+    return [TaskSummary.model_validate(row) for row in created]
+
+
+async def touch_task(db: AsyncSession, task_id: uuid.UUID):
+    """Bump changed_at for changes stored in other tables (comments, files), so /changes picks them up.
+    updated_at is left alone: trends date completions by it."""
+    await db.execute(
+        update(Task).where(Task.id == task_id).values(changed_at=func.now()).execution_options(synchronize_session=False)
     )
-    tasks = refreshed.unique().scalars().all()
-    return [TaskResponse.model_validate(t) for t in tasks]
 
 
-@router.get("", response_model=TaskListResponse)
+def _prefix_tsquery(search: str):
+    """to_tsquery matching every word of the input as a prefix, or None if there are no words."""
+    terms = re.findall(r"[^\W_]+", search.lower())
+    if not terms:
+        return None
+    return func.to_tsquery("english", " & ".join(f"{t}:*" for t in terms))
+
+
+def _id_in(ids: List[uuid.UUID]):
+    """`id = ANY(:ids)` with a single array parameter instead of one bind per id."""
+    return Task.id == any_(bindparam("ids", list(ids), type_=ARRAY(PGUUID(as_uuid=True))))
+
+
+@router.patch("/bulk", response_model=TaskBulkResult)
+async def bulk_update_tasks(data: TaskBulkUpdate, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    values = {}
+    try:
+        if data.status is not None:
+            values["status"] = TaskStatus(data.status)
+        if data.priority is not None:
+            values["priority"] = TaskPriority(data.priority)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if data.assigned_to is not None:
+        values["assigned_to"] = data.assigned_to
+    if not values:
+        raise HTTPException(status_code=400, detail="No fields to update")
+
+    result = await db.execute(
+        update(Task)
+        .where(_id_in(data.ids), Task.is_deleted == False)
+        .values(**values)
+        .returning(Task.id)
+        .execution_options(synchronize_session=False)
+    )
+    ids = result.scalars().all()
+    if ids:
+        await cache_invalidate("tasks", "analytics")
+        changes = {k: (v.value if isinstance(v, (TaskStatus, TaskPriority)) else str(v)) for k, v in values.items()}
+        await manager.broadcast({"type": "tasks_updated", "data": {"task_ids": [str(i) for i in ids], "changes": changes}})
+    return TaskBulkResult(count=len(ids), ids=ids)
+
+
+@router.post("/bulk-delete", response_model=TaskBulkResult)
+async def bulk_delete_tasks(data: TaskBulkDelete, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    result = await db.execute(
+        update(Task)
+        .where(_id_in(data.ids), Task.is_deleted == False)
+        .values(is_deleted=True)
+        .returning(Task.id)
+        .execution_options(synchronize_session=False)
+    )
+    ids = result.scalars().all()
+    if ids:
+        await cache_invalidate("tasks", "analytics")
+        await manager.broadcast({"type": "tasks_deleted", "data": {"task_ids": [str(i) for i in ids]}})
+    return TaskBulkResult(count=len(ids), ids=ids)
+
+
+@router.get("", response_model=Union[TaskListResponse, TaskSummaryListResponse])
 async def list_tasks(
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
@@ -135,24 +336,44 @@ async def list_tasks(
     priority: Optional[str] = None,
     assigned_to: Optional[uuid.UUID] = None,
     search: Optional[str] = None,
-    sort_by: str = Query("created_at", pattern="^(created_at|updated_at|due_date|title|priority|status)$"),
+    sort_by: str = Query("created_at", pattern="^(created_at|updated_at|due_date|title|priority|status|relevance)$"),
     sort_order: str = Query("desc", pattern="^(asc|desc)$"),
     tag: Optional[str] = None,
+    pagination: str = Query("offset", pattern="^(offset|cursor)$"),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    view: str = Query("full", pattern="^(full|summary)$"),
+    # substring stays the default: English stemming and stop words change what fts matches
+    search_mode: str = Query("substring", pattern="^(fts|substring)$"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    cache_key = f"tasks:{current_user.id}:{page}:{page_size}:{status}:{priority}:{assigned_to}:{search}:{sort_by}:{sort_order}:{tag}"
+    summary = view == "summary"
+    list_schema = TaskSummaryListResponse if summary else TaskListResponse
+    item_schema = TaskSummary if summary else TaskResponse
+
+    # Passing a cursor implies cursor mode; `pagination=cursor` requests the first page
+    use_cursor = pagination == "cursor" or cursor is not None
+    if use_cursor:
+        cache_key = f"{current_user.id}:{view}:cursor:{cursor}:{page_size}:{status}:{priority}:{assigned_to}:{search}:{search_mode}:{sort_by}:{sort_order}:{tag}:{include_total}"
+    else:
+        cache_key = f"{current_user.id}:{view}:{page}:{page_size}:{status}:{priority}:{assigned_to}:{search}:{search_mode}:{sort_by}:{sort_order}:{tag}"
+    cache_key = await cache_versioned_key("tasks", cache_key)
     cached = await cache_get(cache_key)
     if cached:
-        return TaskListResponse.model_validate_json(cached)
-
-    query = select(Task).where(Task.is_deleted == False).options(
-        selectinload(Task.creator),
-        selectinload(Task.assignee),
-        selectinload(Task.tags),
-        selectinload(Task.files),
-        selectinload(Task.comments).selectinload(Comment.author),
-    )
+        # Already-valid JSON: skip parsing and response_model re-serialisation
+        return Response(content=cached, media_type="application/json")
+
+    if summary:
+        query = _summary_query().where(Task.is_deleted == False)
+    else:
+        query = select(Task).where(Task.is_deleted == False).options(
+            selectinload(Task.creator),
+            selectinload(Task.assignee),
+            selectinload(Task.tags),
+            selectinload(Task.files),
+            selectinload(Task.comments).selectinload(Comment.author),
+        )
 
     if status:
         query = query.where(Task.status == TaskStatus(status))
@@ -160,25 +381,67 @@ async def list_tasks(
         query = query.where(Task.priority == TaskPriority(priority))
     if assigned_to:
         query = query.where(Task.assigned_to == assigned_to)
-    if search:
+    tsquery = _prefix_tsquery(search) if search and search_mode == "fts" else None
+    if tsquery is not None:
+        query = query.where(Task.search_vector.op("@@")(tsquery))
+    elif search:
+        # Substring match, served by the pg_trgm indexes on title and description
         query = query.where(or_(Task.title.ilike(f"%{search}%"), Task.description.ilike(f"%{search}%")))
     if tag:
         query = query.join(Task.tags).where(Tag.name == tag.lower())
 
+    if sort_by == "relevance":
+        if tsquery is None:
+            raise HTTPException(status_code=400, detail="sort_by=relevance requires search with search_mode=fts")
+        if use_cursor:
+            raise HTTPException(status_code=400, detail="sort_by=relevance is not supported with cursor pagination")
+        sort_col = func.ts_rank(Task.search_vector, tsquery)
+    else:
+        sort_col = getattr(Task, sort_by)
+
+    if use_cursor:
+        total = None
+        if include_total:
+            total = (await db.execute(select(func.count()).select_from(query.subquery()))).scalar()
+        if cursor:
+            value, last_id = _decode_cursor(cursor, sort_by, sort_order)
+            query = query.where(_keyset_condition(sort_col, sort_order, value, last_id, nullable=sort_by in _NULLABLE_SORTS))
+        order = desc if sort_order == "desc" else asc
+        query = query.order_by(order(sort_col), order(Task.id)).limit(page_size + 1)
+
+        result = await db.execute(query)
+        tasks = result.all() if summary else result.unique().scalars().all()
+        next_cursor = None
+        if len(tasks) > page_size:
+            tasks = tasks[:page_size]
+            next_cursor = _encode_cursor(tasks[-1], sort_by, sort_order)
+
+        response = list_schema(
+            tasks=[item_schema.model_validate(t) for t in tasks],
+            total=total,
+            page=page,
+            page_size=page_size,
+            total_pages=math.ceil(total / page_size) if total is not None else None,
+            next_cursor=next_cursor,
+        )
+        await cache_set(cache_key, response.model_dump_json(), ttl=60)
+        return response
+
     count_query = select(func.count()).select_from(query.subquery())
     total_result = await db.execute(count_query)
     total = total_result.scalar()
 
-    sort_col = getattr(Task, sort_by)
-    query = query.order_by(desc(sort_col) if sort_order == "desc" else asc(sort_col))
+    # id breaks ties (equal ts_rank scores are common) so offset pages neither repeat nor skip rows
+    order = desc if sort_order == "desc" else asc
+    query = query.order_by(order(sort_col), order(Task.id))
     query = query.offset((page - 1) * page_size).limit(page_size)
 
     result = await db.execute(query)
-    tasks = result.unique().scalars().all()
+    tasks = result.all() if summary else result.unique().scalars().all()
     total_pages = math.ceil(total / page_size) if total else 0
 
-    response = TaskListResponse(
-        tasks=[TaskResponse.model_validate(t) for t in tasks],
+    response = list_schema(
+        tasks=[item_schema.model_validate(t) for t in tasks],
         total=total,
         page=page,
         page_size=page_size,
@@ -189,6 +452,69 @@ async def list_tasks(
     return response
 
 
+# changed_at is the writing transaction's start time, so a slow transaction can commit a row
+# older than one a client has already seen; rows this recent are held back until they settle.
+SYNC_SETTLE_SECONDS = 5
+
+
+def _encode_sync_token(changed_at: datetime.datetime, task_id: uuid.UUID) -> str:
+    payload = {"u": changed_at.isoformat(), "id": str(task_id)}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def _decode_sync_token(token: str):
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.datetime.fromisoformat(payload["u"]), uuid.UUID(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+
+
+@router.get("/changes", response_model=TaskChangesResponse)
+async def list_task_changes(
+    since: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Tasks changed after the `since` token, with description and tag names, soft-deleted ones included
+    as tombstones, walked along ix_tasks_changed_at_id. Tag, comment and file changes touch changed_at,
+    so counts and tags stay in sync. Omit `since` for a full sync; keep the returned token for the next call."""
+    query = (
+        _summary_query()
+        .add_columns(Task.description, Task.changed_at)
+        .where(Task.changed_at <= func.now() - datetime.timedelta(seconds=SYNC_SETTLE_SECONDS))
+        .order_by(Task.changed_at, Task.id)
+        .limit(limit + 1)
+    )
+    if since:
+        changed_at, last_id = _decode_sync_token(since)
+        query = query.where(tuple_(Task.changed_at, Task.id) > tuple_(changed_at, last_id))
+
+    rows = (await db.execute(query)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_token = _encode_sync_token(rows[-1].changed_at, rows[-1].id) if rows else since
+
+    # Current tag names for the whole page in one query, so clients needn't re-fetch changed tasks
+    tags = {r.id: [] for r in rows}
+    if rows:
+        tag_rows = await db.execute(
+            select(task_tags.c.task_id, Tag.name)
+            .join(Tag, Tag.id == task_tags.c.tag_id)
+            .where(task_tags.c.task_id.in_(list(tags)))
+            .order_by(Tag.name)
+        )
+        for task_id, name in tag_rows:
+            tags[task_id].append(name)
+    return TaskChangesResponse(
+        tasks=[TaskChange(**r._mapping, tags=tags[r.id]) for r in rows],
+        next_token=next_token,
+        has_more=has_more,
+    )
+
+
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task(task_id: uuid.UUID, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
     result = await db.execute(
@@ -227,6 +553,8 @@ async def update_task(task_id: uuid.UUID, data: TaskUpdate, db: AsyncSession = D
         task.assigned_to = data.assigned_to
     if data.tags is not None:
         task.tags = await get_or_create_tags(db, data.tags)
+        # A tags-only change writes nothing to the tasks row; touch it for the change feed
+        task.changed_at = func.now()
     if data.notify_overdue is not None:
         task.notify_overdue = data.notify_overdue
 
@@ -239,8 +567,7 @@ async def update_task(task_id: uuid.UUID, data: TaskUpdate, db: AsyncSession = D
             task.status = _compute_status(task.start_date, task.due_date)
 
     await db.flush()
-    await cache_delete_pattern("tasks:*")
-    await cache_delete_pattern("analytics:*")
+    await cache_invalidate("tasks", "analytics")
 
     await manager.broadcast({"type": "task_updated", "data": {"task_id": str(task.id), "title": task.title}})
 
@@ -267,8 +594,7 @@ async def delete_task(task_id: uuid.UUID, db: AsyncSession = Depends(get_db), cu
 
     task.is_deleted = True
     await db.flush()
-    await cache_delete_pattern("tasks:*")
-    await cache_delete_pattern("analytics:*")
+    await cache_invalidate("tasks", "analytics")
 
     await manager.broadcast({"type": "task_deleted", "data": {"task_id": str(task.id)}})
 
@@ -1,7 +1,8 @@
 import uuid
 import datetime
 from typing import Optional, List
-from pydantic import BaseModel, EmailStr, Field, ConfigDict
+from pydantic import BaseModel, EmailStr, Field, ConfigDict, computed_field
+from app.storage import generate_presigned_url
 
 
 class UserCreate(BaseModel):
@@ -77,8 +78,27 @@ class TaskUpdate(BaseModel):
     notify_overdue: Optional[bool] = None
 
 
+MAX_BULK_TASKS = 1000
+
+
 class TaskBulkCreate(BaseModel):
-    tasks: List[TaskCreate]
+    tasks: List[TaskCreate] = Field(..., min_length=1, max_length=MAX_BULK_TASKS)
+
+
+class TaskBulkUpdate(BaseModel):
+    ids: List[uuid.UUID] = Field(..., min_length=1, max_length=MAX_BULK_TASKS)
+    status: Optional[str] = None
+    priority: Optional[str] = None
+    assigned_to: Optional[uuid.UUID] = None
+
+
+class TaskBulkDelete(BaseModel):
+    ids: List[uuid.UUID] = Field(..., min_length=1, max_length=MAX_BULK_TASKS)
+
+
+class TaskBulkResult(BaseModel):
+    count: int
+    ids: List[uuid.UUID]
 
 
 class FileResponse(BaseModel):
@@ -87,10 +107,35 @@ class FileResponse(BaseModel):
     original_filename: str
     content_type: str
     size: int
+    thumbnail_key: Optional[str] = Field(None, exclude=True)
     created_at: datetime.datetime
 
     model_config = ConfigDict(from_attributes=True)
 
+    @computed_field
+    @property
+    def thumbnail_url(self) -> Optional[str]:
+        # Signed when the response is serialized, not whenever a File row is read
+        return generate_presigned_url(self.thumbnail_key) if self.thumbnail_key else None
+
+
+class FileUploadRequest(BaseModel):
+    filename: str = Field(..., min_length=1, max_length=255)
+    content_type: str
+    size: int = Field(..., gt=0)
+
+
+class FileUploadTicket(BaseModel):
+    key: str
+    url: str
+    fields: dict
+    expires_in: int
+
+
+class FileUploadFinalize(BaseModel):
+    key: str
+    original_filename: str = Field(..., min_length=1, max_length=255)
+
 
 class CommentBase(BaseModel):
     content: str = Field(..., min_length=1, max_length=5000)
@@ -143,10 +188,51 @@ class TaskResponse(BaseModel):
 
 class TaskListResponse(BaseModel):
     tasks: List[TaskResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+
+class TaskSummary(BaseModel):
+    id: uuid.UUID
+    title: str
+    status: str
+    priority: str
+    start_date: Optional[datetime.datetime] = None
+    due_date: Optional[datetime.datetime] = None
+    notify_overdue: bool = False
+    is_deleted: bool
+    created_by: uuid.UUID
+    assigned_to: Optional[uuid.UUID] = None
+    comment_count: int = 0
+    file_count: int = 0
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class TaskSummaryListResponse(BaseModel):
+    tasks: List[TaskSummary]
+    total: Optional[int] = None
+    page: int
+    page_size: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+
+class TaskChange(TaskSummary):
+    description: Optional[str] = None
+    tags: List[str] = []
+    changed_at: datetime.datetime
+
+
+class TaskChangesResponse(BaseModel):
+    tasks: List[TaskChange]
+    next_token: Optional[str] = None
+    has_more: bool
 
 
 class TaskOverview(BaseModel):
@@ -175,6 +261,17 @@ class TaskTrend(BaseModel):
     completed: int
 
 
+class Suggestion(BaseModel):
+    id: uuid.UUID
+    label: str
+
+
+class SuggestionResponse(BaseModel):
+    tasks: List[Suggestion] = []
+    tags: List[Suggestion] = []
+    users: List[Suggestion] = []
+
+
 class WebSocketMessage(BaseModel):
     type: str
     data: dict
@@ -197,3 +294,19 @@ class NotificationListResponse(BaseModel):
     notifications: List[NotificationResponse]
     unread_count: int
 
+
+class ExportJobCreate(BaseModel):
+    format: str = Field(default="xlsx", pattern=r"^(xlsx|csv|ndjson)$")
+
+
+class ExportJobResponse(BaseModel):
+    id: uuid.UUID
+    format: str
+    status: str
+    data_version: str
+    error: Optional[str] = None
+    download_url: Optional[str] = None
+    created_at: datetime.datetime
+    completed_at: Optional[datetime.datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
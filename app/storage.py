@@ -1,49 +1,204 @@
+import re
 import uuid
+import asyncio
+import hashlib
+import threading
 import boto3
 from botocore.config import Config as BotoConfig
+from botocore.exceptions import ClientError
 from app.config import settings
 
+_s3_client = None
+_s3_client_lock = threading.Lock()
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+THUMBNAIL_CONTENT_TYPES = {"image/png", "image/jpeg", "image/gif"}
+
 
 def get_s3_client():
-    kwargs = dict(
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-        region_name=settings.AWS_REGION,
-        config=BotoConfig(signature_version="s3v4"),
-    )
-    if settings.CUSTOM_S3_ENDPOINT_URL:
-        kwargs["endpoint_url"] = settings.CUSTOM_S3_ENDPOINT_URL
-    return boto3.client("s3", **kwargs)
+    """Process-wide S3 client. boto3 clients are thread-safe, so one instance shares its
+    connection pool and resolved credentials across every request and worker thread."""
+    global _s3_client
+    if _s3_client is None:
+        with _s3_client_lock:
+            if _s3_client is None:
+                kwargs = dict(
+                    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                    region_name=settings.AWS_REGION,
+                    config=BotoConfig(signature_version="s3v4", max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS),
+                )
+                if settings.CUSTOM_S3_ENDPOINT_URL:
+                    kwargs["endpoint_url"] = settings.CUSTOM_S3_ENDPOINT_URL
+                _s3_client = boto3.client("s3", **kwargs)
+    return _s3_client
 
 
-async def upload_file_to_s3(file_content: bytes, original_filename: str, content_type: str) -> str:
-    s3 = get_s3_client()
+class FileTooLargeError(Exception):
+    pass
+
+
+class InvalidRangeError(Exception):
+    pass
+
+
+def _new_file_key(original_filename: str, prefix: str = "taskhub/files") -> str:
     ext = original_filename.rsplit(".", 1)[-1] if "." in original_filename else ""
-    key = f"taskhub/files/{uuid.uuid4()}.{ext}" if ext else f"taskhub/files/{uuid.uuid4()}"
-    s3.put_object(
-        Bucket=settings.AWS_BUCKET,
-        Key=key,
-        Body=file_content,
-        ContentType=content_type,
+    return f"{prefix}/{uuid.uuid4()}.{ext}" if ext else f"{prefix}/{uuid.uuid4()}"
+
+
+def _direct_upload_prefix(task_id: uuid.UUID) -> str:
+    return f"taskhub/files/{task_id}"
+
+
+def is_direct_upload_key(key: str, task_id: uuid.UUID) -> bool:
+    """True only for keys generate_presigned_upload could have issued for this task: one
+    uuid-named object directly under its prefix, which excludes derived `.thumb.jpg` objects."""
+    name = key.removeprefix(_direct_upload_prefix(task_id) + "/")
+    return name != key and re.fullmatch(r"[0-9a-f-]{36}(\.[^./]+)?", name) is not None
+
+
+# The async helpers run the blocking boto3 calls in a worker thread so they never stall the event loop
+
+def thumbnail_key_for(key: str) -> str:
+    return f"{key}.thumb.jpg"
+
+
+def blob_key(sha256: str) -> str:
+    return f"taskhub/blobs/{sha256}"
+
+
+async def hash_upload(file, max_size: int, chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> tuple[str, int]:
+    """SHA-256 and size of an async file-like object, read in chunks and enforcing max_size.
+    Rewinds the file afterwards so it can be streamed to S3."""
+    digest = hashlib.sha256()
+    size = 0
+    while chunk := await file.read(chunk_size):
+        size += len(chunk)
+        if size > max_size:
+            raise FileTooLargeError()
+        digest.update(chunk)
+    await file.seek(0)
+    return digest.hexdigest(), size
+
+
+async def stream_upload_to_s3(
+    file, original_filename: str, content_type: str, max_size: int, key: str | None = None,
+) -> tuple[str, int]:
+    """Upload from an async file-like object (e.g. UploadFile) one part at a time, so at most one
+    part is held in memory. Raises FileTooLargeError as soon as more than max_size bytes are read.
+    Files that fit in a single part skip the multipart protocol. Returns (key, size)."""
+    s3 = get_s3_client()
+    key = key or _new_file_key(original_filename)
+    part_size = settings.S3_MULTIPART_CHUNK_SIZE
+
+    chunk = await file.read(part_size)
+    size = len(chunk)
+    if size > max_size:
+        raise FileTooLargeError(original_filename)
+    if size < part_size:
+        await asyncio.to_thread(
+            s3.put_object, Bucket=settings.AWS_BUCKET, Key=key, Body=chunk, ContentType=content_type,
+        )
+        return key, size
+
+    upload = await asyncio.to_thread(
+        s3.create_multipart_upload, Bucket=settings.AWS_BUCKET, Key=key, ContentType=content_type,
     )
-    return key
+    upload_id = upload["UploadId"]
+    parts = []
+    try:
+        while chunk:
+            part_number = len(parts) + 1
+            result = await asyncio.to_thread(
+                s3.upload_part,
+                Bucket=settings.AWS_BUCKET, Key=key, UploadId=upload_id, PartNumber=part_number, Body=chunk,
+            )
+            parts.append({"ETag": result["ETag"], "PartNumber": part_number})
+            chunk = await file.read(part_size)
+            size += len(chunk)
+            if size > max_size:
+                raise FileTooLargeError(original_filename)
+        await asyncio.to_thread(
+            s3.complete_multipart_upload,
+            Bucket=settings.AWS_BUCKET, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts},
+        )
+    except BaseException:
+        await asyncio.to_thread(s3.abort_multipart_upload, Bucket=settings.AWS_BUCKET, Key=key, UploadId=upload_id)
+        raise
+    return key, size
 
 
-async def get_file_from_s3(key: str) -> bytes:
+async def open_s3_object(key: str, byte_range: str | None = None) -> dict:
+    """get_object without reading the body; pass an HTTP Range header value to fetch part of it."""
     s3 = get_s3_client()
-    response = s3.get_object(Bucket=settings.AWS_BUCKET, Key=key)
-    return response["Body"].read()
+    kwargs = {"Bucket": settings.AWS_BUCKET, "Key": key}
+    if byte_range:
+        kwargs["Range"] = byte_range
+    try:
+        return await asyncio.to_thread(s3.get_object, **kwargs)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") == "InvalidRange":
+            raise InvalidRangeError(byte_range)
+        raise
+
+
+async def iter_s3_body(body, chunk_size: int = DOWNLOAD_CHUNK_SIZE):
+    try:
+        while chunk := await asyncio.to_thread(body.read, chunk_size):
+            yield chunk
+    finally:
+        body.close()
+
+
+async def head_s3_object(key: str) -> dict | None:
+    """Object metadata, or None if the key does not exist."""
+    s3 = get_s3_client()
+    try:
+        return await asyncio.to_thread(s3.head_object, Bucket=settings.AWS_BUCKET, Key=key)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return None
+        raise
 
 
 async def delete_file_from_s3(key: str):
     s3 = get_s3_client()
-    s3.delete_object(Bucket=settings.AWS_BUCKET, Key=key)
+    await asyncio.to_thread(s3.delete_object, Bucket=settings.AWS_BUCKET, Key=key)
 
 
-def generate_presigned_url(key: str, expiration: int = 3600) -> str:
+def upload_fileobj_to_s3(fileobj, key: str, content_type: str):
+    """Blocking streamed upload (multipart for large files), for use from Celery workers."""
     s3 = get_s3_client()
+    s3.upload_fileobj(fileobj, settings.AWS_BUCKET, key, ExtraArgs={"ContentType": content_type})
+    return key
+
+
+def generate_presigned_url(key: str, expiration: int = 3600, download_filename: str | None = None) -> str:
+    s3 = get_s3_client()
+    params = {"Bucket": settings.AWS_BUCKET, "Key": key}
+    if download_filename:
+        params["ResponseContentDisposition"] = f'attachment; filename="{download_filename}"'
     return s3.generate_presigned_url(
         "get_object",
-        Params={"Bucket": settings.AWS_BUCKET, "Key": key},
+        Params=params,
+        ExpiresIn=expiration,
+    )
+
+
+def generate_presigned_upload(
+    task_id: uuid.UUID, original_filename: str, content_type: str, max_size: int, expiration: int = 3600,
+) -> dict:
+    """Presigned POST for a browser upload straight to the bucket. The policy pins the key and
+    Content-Type and caps the body size, so S3 itself rejects anything else. Keys live under the
+    task's own prefix so finalize can tell which task an upload was issued for."""
+    s3 = get_s3_client()
+    key = _new_file_key(original_filename, prefix=_direct_upload_prefix(task_id))
+    post = s3.generate_presigned_post(
+        Bucket=settings.AWS_BUCKET,
+        Key=key,
+        Fields={"Content-Type": content_type},
+        Conditions=[{"Content-Type": content_type}, ["content-length-range", 1, max_size]],
         ExpiresIn=expiration,
     )
+    return {"key": key, "url": post["url"], "fields": post["fields"]}
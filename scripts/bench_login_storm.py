@@ -0,0 +1,118 @@
+"""Login-storm benchmark: p99 latency of an unrelated endpoint while /api/auth/login is hammered.
+
+bcrypt runs on the bounded password pool (PASSWORD_HASH_WORKERS), so /api/health latency should
+stay roughly flat under the storm instead of growing with every concurrent login.
+
+Run against a live server (single uvicorn worker makes the effect easiest to see):
+
+    uvicorn app.main:app --port 8000
+    python scripts/bench_login_storm.py --url http://localhost:8000 --concurrency 50 --duration 20
+
+Stdlib only, so it runs wherever the API does.
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _request(url: str, body: dict | None = None) -> int:
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            resp.read()
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def _register(base: str) -> dict:
+    suffix = uuid.uuid4().hex[:8]
+    creds = {"email": f"bench-{suffix}@example.com", "password": "bench-password"}
+    status = _request(f"{base}/api/auth/register", {**creds, "username": f"bench_{suffix}", "full_name": "Login Bench"})
+    if status != 201:
+        raise SystemExit(f"register failed with HTTP {status}")
+    return creds
+
+
+def _probe(base: str, stop: threading.Event, interval: float) -> list[float]:
+    """Sequential /api/health requests until stopped; returns latencies in ms."""
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        _request(f"{base}/api/health")
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(interval)
+    return latencies
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _summary(label: str, latencies: list[float]) -> str:
+    return (
+        f"{label:<12} n={len(latencies):<5} p50={statistics.median(latencies):7.1f}ms "
+        f"p99={_percentile(latencies, 99):7.1f}ms max={max(latencies):7.1f}ms"
+    )
+
+
+def _measure(base: str, seconds: float, interval: float, storm=None) -> tuple[list[float], int]:
+    stop = threading.Event()
+    logins = 0
+    with ThreadPoolExecutor(max_workers=1) as probe_pool:
+        probe = probe_pool.submit(_probe, base, stop, interval)
+        if storm is None:
+            time.sleep(seconds)
+        else:
+            logins = storm(seconds)
+        stop.set()
+        return probe.result(), logins
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=50, help="concurrent login clients")
+    parser.add_argument("--duration", type=float, default=20, help="seconds per phase")
+    parser.add_argument("--interval", type=float, default=0.05, help="pause between health probes")
+    args = parser.parse_args()
+    base = args.url.rstrip("/")
+
+    creds = _register(base)
+
+    def storm(seconds: float) -> int:
+        deadline = time.monotonic() + seconds
+        count = 0
+        lock = threading.Lock()
+
+        def client():
+            nonlocal count
+            while time.monotonic() < deadline:
+                _request(f"{base}/api/auth/login", creds)
+                with lock:
+                    count += 1
+
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            for _ in range(args.concurrency):
+                pool.submit(client)
+        return count
+
+    baseline, _ = _measure(base, args.duration, args.interval)
+    during, logins = _measure(base, args.duration, args.interval, storm)
+
+    print(_summary("baseline", baseline))
+    print(_summary("login storm", during))
+    print(f"logins completed: {logins} ({logins / args.duration:.1f}/s at concurrency {args.concurrency})")
+    print(f"p99 ratio storm/baseline: {_percentile(during, 99) / _percentile(baseline, 99):.2f}x")
+
+
+if __name__ == "__main__":
+    main()